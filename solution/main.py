@@ -3,11 +3,66 @@
 DWH Coding Challenge Solution
 """
 
-import json
+import heapq
+import mmap
 import os
+import zoneinfo
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import glob
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Fallback to stdlib parser when orjson is not installed
+    orjson = None
+    import json
+
+def _local_timezone():
+    """Name of the host time zone (TZ, then /etc/localtime), falling back to UTC"""
+    name = os.environ.get('TZ', '').lstrip(':')
+    if not name or name.startswith('/'):
+        name = os.path.realpath(name or '/etc/localtime')
+    if '/zoneinfo/' in name:
+        name = name.split('/zoneinfo/', 1)[1]
+    try:
+        zoneinfo.ZoneInfo(name)
+    except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+        return 'UTC'
+    return name
+
+LOCAL_TZ = _local_timezone()
+
+def _format_epoch_ms(values):
+    """Format epoch milliseconds in local time, like datetime.fromtimestamp, in one vectorized pass"""
+    # A named zone converts in bulk; naive values then strftime without per-value offset lookups
+    datetimes = pd.to_datetime(pd.Series(values), unit='ms', utc=True).dt.tz_convert(LOCAL_TZ)
+    return datetimes.dt.tz_localize(None).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+TRANSACTION_COLUMNS = ['timestamp', 'datetime', 'type', 'card_id', 'savings_account_id', 'value', 'description']
+
+# Tables with fewer event files than this are read sequentially
+PARALLEL_MIN_FILES = 1000
+
+# Event files at least this large are parsed from a memory map instead of a read() copy
+MMAP_MIN_SIZE = 64 * 1024
+
+def _read_event(file_path):
+    """Read and parse a single JSON event file"""
+    with open(file_path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+
+def _read_events(file_paths):
+    """Read and parse JSON event files in order"""
+    return [_read_event(file_path) for file_path in file_paths]
 
 class EventLogProcessor:
     """
@@ -19,42 +74,77 @@ class EventLogProcessor:
         self.accounts = {}
         self.cards = {}
         self.savings = {}
+        self._events_cache = {}
+        self._row_index = {}
 
     def load_and_process_table(self, table_name):
         """
-        Load JSON files to process the table into its final state
+        Load JSON files to process the table into its final state.
+        The state is kept column-wise: one list per field (NaN where a record
+        lacks the field), with the row of each record id tracked in
+        self._row_index[table_name].
         """
-        table_path = os.path.join(self.data_dir, table_name)
-        
-        # Load JSON files and sort by timestamp
-        json_files = glob.glob(os.path.join(table_path, "*.json"))
-        json_files.sort(key=lambda x: int(os.path.basename(x).replace('.json', '')))
-        
-        # Load events
-        events = []
-        for file_path in json_files:
-            with open(file_path, 'r') as f:
-                events.append(json.load(f))
+        events = self._load_events(table_name)
+        self._events_cache[table_name] = events
         
         # Process events into final state
-        records = {}
+        columns = {'id': [], 'created_at': [], 'last_updated': []}
+        row_index = {}
+        # (first row holding the field, write order) gives the column order a union of per-record dicts would have
+        first_seen = {key: (-1, order) for order, key in enumerate(columns)}
+        write_order = 0
+        # Local bindings keep attribute lookups out of the replay loop
+        ids = columns['id']
+        created_at = columns['created_at']
+        last_updated = columns['last_updated']
+        columns_get = columns.get
+        row_index_get = row_index.get
         for event in events:
             record_id = event.get('id')
             if not record_id:
                 continue
+            op = event['op']
+            ts = event['ts']
                 
-            if event.get('op') == 'c':  # Create
-                records[record_id] = {
-                    'created_at': event.get('ts'),
-                    'last_updated': event.get('ts'),
-                    **event.get('data', {})
-                }
-            elif event.get('op') == 'u':  # Update
-                if record_id in records:
-                    records[record_id]['last_updated'] = event.get('ts')
-                    records[record_id].update(event.get('set', {}))
+            if op == 'c':  # Create
+                row = row_index_get(record_id)
+                if row is None:
+                    row = row_index[record_id] = len(ids)
+                    for values in columns.values():
+                        values.append(np.nan)
+                else:
+                    # Re-created record starts from a clean row
+                    for values in columns.values():
+                        values[row] = np.nan
+                ids[row] = record_id
+                created_at[row] = ts
+                fields = event['data']
+            elif op == 'u':  # Update
+                row = row_index_get(record_id)
+                if row is None:
+                    continue
+                fields = event['set']
+            else:
+                continue
+            
+            last_updated[row] = ts
+            for key, value in fields.items():
+                values = columns_get(key)
+                if values is None:
+                    # First time this field shows up, pad the rows created before
+                    values = columns[key] = [np.nan] * len(ids)
+                    first_seen[key] = (row, write_order)
+                elif row < first_seen[key][0]:
+                    first_seen[key] = (row, write_order)
+                values[row] = value
+                write_order += 1
         
-        return records
+        self._row_index[table_name] = row_index
+        # Fields only held by records that were re-created since are dropped, like the replaced dicts dropped them
+        return {
+            key: columns[key] for key in sorted(columns, key=first_seen.__getitem__)
+            if first_seen[key][0] < 0 or any(value is not np.nan for value in columns[key])
+        }
 
     def process_all_tables(self):
         """Process all tables"""
@@ -69,21 +159,25 @@ class EventLogProcessor:
 
     def create_dataframe(self, records):
         """Convert records jadi DataFrame untuk ditampilin"""
-        if not records:
+        return self._build_df(records)
+
+    def _build_df(self, records, format_ts=True):
+        """Build the records DataFrame, optionally leaving timestamps as raw epoch ms"""
+        if not records or not records['id']:
             return pd.DataFrame()
         
-        data = []
-        for record_id, record_data in records.items():
-            row = {'id': record_id, **record_data}
-            
-            # Convert timestamp into readable format
-            for ts_key in ['created_at', 'last_updated']:
-                if ts_key in row and isinstance(row[ts_key], (int, float)):
-                    row[ts_key] = datetime.fromtimestamp(row[ts_key] / 1000).strftime('%Y-%m-%d %H:%M:%S')
-            
-            data.append(row)
+        df = pd.DataFrame(records, copy=False)
         
-        return pd.DataFrame(data)
+        if format_ts:
+            self._format_timestamps(df)
+        return df
+
+    @staticmethod
+    def _format_timestamps(df):
+        """Convert timestamp into readable format in one vectorized pass per column"""
+        for ts_key in ['created_at', 'last_updated']:
+            if ts_key in df:
+                df[ts_key] = _format_epoch_ms(df[ts_key])
 
     # Task 1: Get DataFrames
     def get_accounts_df(self):
@@ -104,9 +198,10 @@ class EventLogProcessor:
         Creates a denormalized view by joining accounts, cards, and
         savings_accounts based on the inferred ID pattern (aX -> cX, aX -> saX).
         """
-        accounts_df = self.get_accounts_df().rename(columns={'id': 'internal_id'})
-        cards_df = self.get_cards_df().rename(columns={'id': 'internal_id'})
-        savings_df = self.get_savings_accounts_df().rename(columns={'id': 'internal_id'})
+        # Keep raw timestamps while joining, only the surviving columns get formatted at the end
+        accounts_df = self._build_df(self.accounts, format_ts=False).rename(columns={'id': 'internal_id'})
+        cards_df = self._build_df(self.cards, format_ts=False).rename(columns={'id': 'internal_id'})
+        savings_df = self._build_df(self.savings, format_ts=False).rename(columns={'id': 'internal_id'})
         
         if accounts_df.empty:
             return pd.DataFrame()
@@ -116,7 +211,7 @@ class EventLogProcessor:
         
         # Link Cards to Accounts (c1 -> a1)
         if not cards_df.empty:
-            cards_df['account_id'] = cards_df['card_id'].str.replace('c', 'a')
+            cards_df['account_id'] = 'a' + cards_df['card_id'].str[1:]
             card_cols = ['account_id', 'card_id', 'card_number', 'credit_used', 'monthly_limit', 'status']
             cards_for_merge = cards_df[card_cols].rename(columns={'status': 'card_status'})
         else:
@@ -124,24 +219,62 @@ class EventLogProcessor:
             
         # Link Savings to Accounts (sa1 -> a1)
         if not savings_df.empty:
-            savings_df['account_id'] = savings_df['savings_account_id'].str.replace('sa', 'a')
+            savings_df['account_id'] = 'a' + savings_df['savings_account_id'].str[2:]
             savings_cols = ['account_id', 'savings_account_id', 'balance', 'interest_rate_percent', 'status']
             savings_for_merge = savings_df[savings_cols].rename(columns={'status': 'savings_status'})
         else:
             savings_for_merge = pd.DataFrame()
 
-        # 2. Perform Merges starting from Accounts
-        result = accounts_df.copy()
+        # Share one categorical dtype for account_id so the join compares integer codes;
+        # null keys get code -1, which _attach_by_account_id leaves unmatched
+        frames = [df for df in (accounts_df, cards_for_merge, savings_for_merge) if not df.empty]
+        account_id_dtype = pd.CategoricalDtype(pd.concat([df['account_id'] for df in frames]).dropna().unique())
+        for df in frames:
+            df['account_id'] = df['account_id'].astype(account_id_dtype)
+            # Status columns hold a handful of values, store them as codes too
+            for col in ('status', 'card_status', 'savings_status'):
+                if col in df:
+                    df[col] = df[col].astype('category')
+
+        # 2. Attach card and savings columns to Accounts (lookup on account_id)
+        # accounts_df is a fresh frame owned by this method, so columns may be attached in place
+        result = accounts_df
         
         if not cards_for_merge.empty:
-            result = result.merge(cards_for_merge, on='account_id', how='left')
+            result = self._attach_by_account_id(result, cards_for_merge)
         
         if not savings_for_merge.empty:
-            result = result.merge(savings_for_merge, on='account_id', how='left')
+            result = self._attach_by_account_id(result, savings_for_merge)
             
         # Clean up and reorder
         result.drop(columns=['internal_id'], errors='ignore', inplace=True)
+        self._format_timestamps(result)
+        
+        return result
+
+    @staticmethod
+    def _attach_by_account_id(result, other_df):
+        """
+        Left-join other_df onto result. When account_id is unique in other_df,
+        the rows are reindexed once by the shared account_id category codes and
+        each column is copied over; clashing column names get the same _x/_y
+        suffixes a merge would produce. Otherwise a merge keeps one row per
+        match so no history is lost. Returns the joined frame.
+        """
+        # Null keys never match
+        matchable = other_df[other_df['account_id'].notna()]
+        if not matchable['account_id'].is_unique:
+            return result.merge(matchable, on='account_id', how='left')
         
+        # One indexer lookup over the account_id codes for all columns, aligned row by row with result
+        lookup = matchable.drop(columns='account_id').set_index(matchable['account_id'].cat.codes)
+        joined = lookup.reindex(result['account_id'].cat.codes).set_axis(result.index)
+        for col in joined.columns:
+            values = joined[col]
+            if col in result:
+                result.rename(columns={col: f'{col}_x'}, inplace=True)
+                col = f'{col}_y'
+            result[col] = values
         return result
 
     # ============================================================================
@@ -149,60 +282,118 @@ class EventLogProcessor:
     # ============================================================================
 
     def analyze_transactions(self):
-        """Analyse transactions based on changes on the balance and credit_used"""
-        transactions = []
-        
+        """
+        Analyse transactions based on changes on the balance and credit_used.
+        Returns one DataFrame row per transaction, sorted by timestamp.
+        """
         # Analyse card transactions (credit_used changes)
-        cards_events = self.load_and_process_table_events('cards')
-        for event in cards_events:
-            if event.get('op') == 'u' and 'credit_used' in event.get('set', {}):
-                transactions.append({
-                    'timestamp': event['ts'],
-                    'datetime': datetime.fromtimestamp(event['ts'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-                    'type': 'card_transaction',
-                    'card_id': self.get_record_field(event['id'], 'cards', 'card_id'),
-                    'value': event['set']['credit_used'],
-                    'description': f"Credit used updated to {event['set']['credit_used']}"
-                })
+        card_transactions = self._collect_transactions(
+            'cards', 'credit_used', 'card_id', 'card_transaction', 'Credit used updated to ')
         
         # Analyse savings account transactions (balance changes)
-        savings_events = self.load_and_process_table_events('savings_accounts')
-        for event in savings_events:
-            if event.get('op') == 'u' and 'balance' in event.get('set', {}):
-                transactions.append({
-                    'timestamp': event['ts'],
-                    'datetime': datetime.fromtimestamp(event['ts'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-                    'type': 'savings_transaction',
-                    'savings_account_id': self.get_record_field(event['id'], 'savings_accounts', 'savings_account_id'),
-                    'value': event['set']['balance'],
-                    'description': f"Balance updated to {event['set']['balance']}"
-                })
+        savings_transactions = self._collect_transactions(
+            'savings_accounts', 'balance', 'savings_account_id', 'savings_transaction', 'Balance updated to ')
+        
+        # Events are read in timestamp order, so both tables are already sorted and only need merging.
+        # Merging (timestamp, row) pairs keeps card rows first on equal timestamps.
+        frames = [df for df in (card_transactions, savings_transactions) if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=TRANSACTION_COLUMNS)
+        
+        combined = pd.concat(frames, ignore_index=True)
+        sorted_runs, offset = [], 0
+        for df in frames:
+            sorted_runs.append(zip(df['timestamp'], range(offset, offset + len(df))))
+            offset += len(df)
+        order = [row for _, row in heapq.merge(*sorted_runs)]
+        return combined.take(order).reset_index(drop=True).reindex(columns=TRANSACTION_COLUMNS)
+
+    def _collect_transactions(self, table_name, value_field, id_field, transaction_type, description):
+        """
+        Collect the update events of a table that change value_field into a
+        DataFrame. Raw fields are gathered first, datetimes and descriptions are
+        then built in one vectorized pass.
+        """
+        id_lookup = self._field_lookup(table_name, id_field)
+        timestamps, record_ids, values = [], [], []
+        for event in self.load_and_process_table_events(table_name):
+            if event.get('op') == 'u' and value_field in event.get('set', {}):
+                timestamps.append(event['ts'])
+                record_ids.append(id_lookup.get(event['id'], 'Unknown'))
+                values.append(event['set'][value_field])
         
-        # Sort transactions by the timestamp
-        transactions.sort(key=lambda x: x['timestamp'])
-        return transactions
+        if not timestamps:
+            return pd.DataFrame()
+        
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'datetime': _format_epoch_ms(timestamps),
+            'type': transaction_type,
+            id_field: record_ids,
+            'value': values,
+            'description': description + pd.Series(values, dtype=object).astype(str)
+        })
     
     def load_and_process_table_events(self, table_name):
-        """Helper function for load events"""
+        """Helper function for load events, reusing the ones already read by load_and_process_table"""
+        events = self._events_cache.get(table_name)
+        if events is None:
+            events = self._load_events(table_name)
+        return events
+
+    def _load_events(self, table_name):
+        """Read the JSON event files of a table sorted by timestamp"""
         table_path = os.path.join(self.data_dir, table_name)
-        json_files = glob.glob(os.path.join(table_path, "*.json"))
-        json_files.sort(key=lambda x: int(os.path.basename(x).replace('.json', '')))
+        if not os.path.isdir(table_path):
+            return []
         
-        events = []
-        for file_path in json_files:
-            with open(file_path, 'r') as f:
-                events.append(json.load(f))
-        return events
+        # File names are the event timestamps, parse each one once for the sort key
+        entries = [(int(entry.name[:-5]), entry.path) for entry in os.scandir(table_path) if entry.name.endswith('.json')]
+        entries.sort()
+        json_files = [path for _, path in entries]
+        
+        # Parsing holds the GIL, so threads only overlap the file reads. That pays off
+        # for large tables on multi-core hosts; otherwise the pool is pure overhead.
+        workers = min(8, os.cpu_count() or 1)
+        if workers < 2 or len(json_files) < PARALLEL_MIN_FILES:
+            return _read_events(json_files)
+        
+        # One batch per worker keeps the per-task overhead out of the hot path (map keeps the order)
+        batch_size = -(-len(json_files) // workers)
+        batches = [json_files[i:i + batch_size] for i in range(0, len(json_files), batch_size)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [event for batch in executor.map(_read_events, batches) for event in batch]
     
+    def _table_state(self, table):
+        """Return the column-wise records and the id -> row map of a table"""
+        if table == 'cards':
+            records = self.cards
+        elif table == 'savings_accounts':
+            records = self.savings
+        elif table == 'accounts':
+            records = self.accounts
+        else:
+            return {}, {}
+        return records, self._row_index.get(table, {})
+
+    def _field_lookup(self, table, field):
+        """Build a {record_id: field value} map for batch lookups, missing fields become 'Unknown'"""
+        records, row_index = self._table_state(table)
+        if field not in records:
+            return {}
+        values = records[field]
+        return {
+            record_id: 'Unknown' if values[row] is np.nan else values[row]
+            for record_id, row in row_index.items()
+        }
+
     def get_record_field(self, record_id, table, field):
         """Get specific field value for a record"""
-        if table == 'cards' and record_id in self.cards:
-            return self.cards[record_id].get(field, 'Unknown')
-        elif table == 'savings_accounts' and record_id in self.savings:
-            return self.savings[record_id].get(field, 'Unknown')
-        elif table == 'accounts' and record_id in self.accounts:
-            return self.accounts[record_id].get(field, 'Unknown')
-        return 'Unknown'
+        records, row_index = self._table_state(table)
+        row = row_index.get(record_id)
+        if row is None or field not in records or records[field][row] is np.nan:
+            return 'Unknown'
+        return records[field][row]
 
 # Main program to execute tasks
 def main():
@@ -321,16 +512,12 @@ def main():
     print(f"\n📋 DETAILED TRANSACTION LIST:")
     print("-" * 120)
     
-    if transactions:
-        for i, transaction in enumerate(transactions, 1):
-            print(f"{i}. {transaction['datetime']} - {transaction['type'].upper()}")
-            print(f"   💰 Value: {transaction['value']}")
-            print(f"   📝 Description: {transaction['description']}")
-            if 'card_id' in transaction:
-                print(f"   💳 Card ID: {transaction['card_id']}")
-            if 'savings_account_id' in transaction:
-                print(f"   🏦 Savings Account ID: {transaction['savings_account_id']}")
-            print()
+    if not transactions.empty:
+        # Render the whole list in one go instead of printing field by field
+        transactions_view = transactions.drop(columns=['timestamp']).fillna({'card_id': '', 'savings_account_id': ''})
+        transactions_view['type'] = transactions_view['type'].str.upper()
+        transactions_view.index = range(1, len(transactions_view) + 1)
+        print(transactions_view.to_string(justify='left'))
     else:
         print("   No transactions found in the event logs.")
     